@@ -1,10 +1,16 @@
 #!/usr/bin/env python3
 
 import os
+import asyncio
+import httpx
 import requests
 import json
+import re
+import time
 from datetime import datetime
+from pathlib import Path
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 
 # Load environment variables from root .env
 load_dotenv()
@@ -12,6 +18,19 @@ load_dotenv('../.env')  # Also try parent directory
 
 # Load environment variables (handled above via .env)
 
+# Atlassian site root (without /wiki) and credentials shared by Jira and Confluence
+CONFLUENCE_BASE = os.getenv('CONFLUENCE_URL', '').rstrip('/').removesuffix('/wiki')
+CONFLUENCE_AUTH = (os.getenv('CONFLUENCE_EMAIL'), os.getenv('CONFLUENCE_API_TOKEN'))
+SPACE_KEY = os.getenv('CONFLUENCE_SPACE_KEY')
+OPENAI_KEY = os.getenv('OPENAI_API_KEY')
+
+# Local cache directory for data reused across runs
+CACHE_DIR = os.path.expanduser('~/.cache/commit2viz')
+
+# Shared HTTP session so Zoom and OpenAI calls reuse pooled connections
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=32))
+
 # Engineer name to Confluence page ID mapping
 ENGINEER_PAGES = {
 "GUY": "491638",
@@ -20,6 +39,31 @@ ENGINEER_PAGES = {
 "MAYA": "557203"
 }
 
+# Jira account IDs by searched name (None for names with no match), seeded from JIRA_USER_CACHE_FILE
+_USER_CACHE = {}
+
+# Resolved Jira account IDs per site, reused across runs
+JIRA_USER_CACHE_FILE = os.path.join(CACHE_DIR, 'jira_users.json')
+JIRA_USER_CACHE_TTL = 7 * 24 * 60 * 60  # 7 days
+
+# Maximum issues accepted by one /rest/api/3/issue/bulk request
+JIRA_BULK_LIMIT = 50
+
+# Discovered Confluence parent page per space, reused across runs
+PARENT_PAGE_CACHE_FILE = os.path.join(CACHE_DIR, 'parent_page.json')
+PARENT_PAGE_CACHE_TTL = 30 * 24 * 60 * 60  # 30 days
+
+# Section headers in the OpenAI reply: "TITLE: ...", "SUMMARY:", "ACTION ITEMS:", "CONTRIBUTIONS [NAME]:"
+_SECTION_RE = re.compile(
+    r'^[ \t]*(?:(TITLE|SUMMARY|ACTION ITEMS)|CONTRIBUTIONS[ \t]*\[?([^\]:\n]+?)\]?)[ \t]*:[ \t]*(.*)$',
+    re.I | re.M
+)
+# Numbered or bulleted action item with optional "| ASSIGNEE: name"
+_ITEM_RE = re.compile(
+    r'^[ \t]*(?:\d+[.)]|[-*])[ \t]*(.+?)(?:[ \t]*\|[ \t]*ASSIGNEE:[ \t]*(.+?))?[ \t]*$',
+    re.I | re.M
+)
+
 def get_zoom_access_token():
     """Get access token for Zoom API using Server-to-Server OAuth"""
     url = "https://zoom.us/oauth/token"
@@ -28,7 +72,7 @@ def get_zoom_access_token():
         'account_id': os.getenv('ZOOM_ACCOUNT_ID')
     }
 
-    response = requests.post(
+    response = SESSION.post(
         url,
         data=data,
         auth=(os.getenv('ZOOM_CLIENT_ID'), os.getenv('ZOOM_CLIENT_SECRET'))
@@ -49,7 +93,7 @@ def get_meeting_transcript(access_token, meeting_id):
         'Authorization': f'Bearer {access_token}'
     }
 
-    response = requests.get(url, headers=headers)
+    response = SESSION.get(url, headers=headers)
 
     if response.status_code == 200:
         recordings = response.json()
@@ -60,7 +104,7 @@ def get_meeting_transcript(access_token, meeting_id):
                 transcript_url = recording['download_url']
 
                 # Download the transcript
-                transcript_response = requests.get(transcript_url + '?access_token=' + access_token)
+                transcript_response = SESSION.get(transcript_url + '?access_token=' + access_token)
                 return transcript_response.text
 
         print("No transcript found for this meeting")
@@ -72,20 +116,13 @@ def get_meeting_transcript(access_token, meeting_id):
 
 def get_active_sprint(project_key):
     """Get the currently active sprint for a project"""
-    base_url = os.getenv('CONFLUENCE_URL', '').rstrip('/')
-    if base_url.endswith('/wiki'):
-        base_url = base_url[:-5]
-
-    email = os.getenv('CONFLUENCE_EMAIL')
-    token = os.getenv('CONFLUENCE_API_TOKEN')
-
     # Try to get sprint from board 2 (from the URL you provided)
     board_id = 2  # From your board URL: /boards/2
 
     # Get active sprints for this board
-    sprint_url = f"{base_url}/rest/agile/1.0/board/{board_id}/sprint"
+    sprint_url = f"{CONFLUENCE_BASE}/rest/agile/1.0/board/{board_id}/sprint"
     sprint_params = {'state': 'active'}
-    sprint_response = requests.get(sprint_url, params=sprint_params, auth=(email, token))
+    sprint_response = SESSION.get(sprint_url, params=sprint_params, auth=CONFLUENCE_AUTH)
 
     if sprint_response.status_code == 200:
         sprints = sprint_response.json().get('values', [])
@@ -97,29 +134,117 @@ def get_active_sprint(project_key):
 
     print("⚠️  No active sprint found")
     print("   Tip: Check your board has an active sprint at:")
-    print(f"   {base_url}/jira/software/projects/{project_key}/boards/{board_id}")
+    print(f"   {CONFLUENCE_BASE}/jira/software/projects/{project_key}/boards/{board_id}")
     return None
 
+def read_openai_stream(resp):
+    """Accumulate the message content from a streamed (SSE) Chat Completions response"""
+    content_parts = []
+    # Decode each line ourselves; event streams carry no charset, so requests would assume latin-1
+    for line in resp.iter_lines():
+        if not line.startswith(b'data: '):
+            continue
+        payload = line[6:].decode('utf-8')
+        if payload == '[DONE]':
+            break
+        for choice in json.loads(payload).get('choices', []):
+            content_parts.append(choice.get('delta', {}).get('content') or '')
+    return ''.join(content_parts)
+
+def parse_meeting_summary_json(content):
+    """Convert the JSON-mode reply into the ai_result dict, raising json.JSONDecodeError on invalid JSON.
+
+    Missing or ill-typed fields fall back to defaults one at a time, so one bad field
+    doesn't discard the rest of the reply.
+    """
+    parsed = json.loads(content)
+    if not isinstance(parsed, dict):
+        parsed = {}
+
+    title = parsed.get('title')
+    summary_html = parsed.get('summary_html')
+    items = parsed.get('action_items')
+    contributions = parsed.get('contributions')
+
+    return {
+        'title': title if isinstance(title, str) and title.strip() else 'Meeting Summary & Transcript',
+        'summary_html': summary_html if isinstance(summary_html, str) else '',
+        'action_items': [
+            {
+                'task': item['task'],
+                'assignee': item['assignee'] if isinstance(item.get('assignee'), str) and item['assignee'] else None
+            }
+            for item in (items if isinstance(items, list) else [])
+            if isinstance(item, dict) and isinstance(item.get('task'), str) and item['task'].strip()
+        ],
+        # Only keep engineers we have pages for and who actually contributed
+        'contributions': {
+            name.upper(): text
+            for name, text in (contributions if isinstance(contributions, dict) else {}).items()
+            if name.upper() in ENGINEER_PAGES and isinstance(text, str) and text.strip()
+            and text.strip().upper() != 'NONE'
+        }
+    }
+
+def parse_meeting_summary(content):
+    """Parse the TITLE/SUMMARY/ACTION ITEMS/CONTRIBUTIONS reply into the ai_result dict"""
+    title = 'Meeting Summary & Transcript'  # default
+    summary_html = content  # default to full content
+    action_items = []
+    contributions = {}
+
+    # Each section runs from the end of its header line to the start of the next header
+    headers = list(_SECTION_RE.finditer(content))
+    for i, match in enumerate(headers):
+        section, engineer, rest = match.groups()
+        body_end = headers[i + 1].start() if i + 1 < len(headers) else len(content)
+        body = content[match.end():body_end]
+        section = section.upper() if section else None
+
+        if section == 'TITLE':
+            title = rest.strip()
+        elif section == 'SUMMARY':
+            summary_html = f"{rest}\n{body}".strip() or summary_html
+        elif section == 'ACTION ITEMS':
+            action_items.extend(
+                {'task': task, 'assignee': assignee or None}
+                for task, assignee in _ITEM_RE.findall(body)
+            )
+        else:
+            # Only keep engineers we have pages for and who actually contributed
+            name = engineer.strip().upper()
+            text = f"{rest}\n{body}".strip()
+            if name in ENGINEER_PAGES and text and text.upper() != 'NONE':
+                contributions[name] = text
+
+    return {
+        'title': title,
+        'summary_html': summary_html,
+        'action_items': action_items,
+        'contributions': contributions
+    }
+
 def generate_meeting_summary_with_openai(transcript_text):
     """Call OpenAI to generate a concise meeting summary and action items with assignees.
 
-    Expects OPENAI_API_KEY in environment. Returns dict with 'title', 'summary_html', and 'action_items'
-    suitable for Confluence storage and Jira ticket creation.
+    Expects OPENAI_API_KEY in environment. Returns dict with 'title', 'summary_html', 'action_items'
+    and 'contributions' (engineer name -> HTML list, for ENGINEER_PAGES) suitable for Confluence
+    storage and Jira ticket creation.
     """
-    api_key = os.getenv('OPENAI_API_KEY')
-    if not api_key:
+    if not OPENAI_KEY:
         return {
             'title': 'Meeting Summary & Transcript',
             'summary_html': "<p><em>OPENAI_API_KEY not set; skipping AI summary.</em></p>",
-            'action_items': []
+            'action_items': [],
+            'contributions': {}
         }
 
     try:
-        # Minimal Chat Completions call via requests to avoid extra deps
-        resp = requests.post(
+        # Chat Completions call over the shared requests session (no OpenAI SDK needed)
+        resp = SESSION.post(
             'https://api.openai.com/v1/chat/completions',
             headers={
-                'Authorization': f'Bearer {api_key}',
+                'Authorization': f'Bearer {OPENAI_KEY}',
                 'Content-Type': 'application/json'
             },
             json={
@@ -134,13 +259,13 @@ def generate_meeting_summary_with_openai(transcript_text):
                             'Then provide a meeting summary with key decisions. '
                             'Finally, extract specific actionable items that can become Jira tickets. '
                             'IMPORTANT: For each action item, identify WHO should do it based on the transcript. '
-                            'Return in this exact format:\n\n'
-                            'TITLE: [Your title here]\n\n'
-                            'SUMMARY:\n[HTML content using only simple tags like <p>, <ul>, <li>, <h3>, <strong>]\n\n'
-                            'ACTION ITEMS:\n'
-                            '1. [Specific actionable task] | ASSIGNEE: [Person\'s name from transcript]\n'
-                            '2. [Another specific actionable task] | ASSIGNEE: [Person\'s name from transcript]\n'
-                            '...\n\n'
+                            'Also list what each of these engineers contributed: ' + ', '.join(ENGINEER_PAGES) + '. '
+                            'Return a JSON object in this exact shape:\n\n'
+                            '{"title": "[Your title here]",\n'
+                            ' "summary_html": "[HTML using only simple tags like <p>, <ul>, <li>, <h3>, <strong>]",\n'
+                            ' "action_items": [{"task": "[Specific actionable task]", '
+                            '"assignee": "[Person\'s name from transcript]" or null}],\n'
+                            ' "contributions": {"[NAME]": "[<ul> of <li> items]" or null if they did not contribute}}\n\n'
                             'Note: Use the exact names as they appear in the transcript (e.g., "Maya", "Eyal").'
                         )
                     },
@@ -150,86 +275,39 @@ def generate_meeting_summary_with_openai(transcript_text):
                             'Analyze the transcript below and provide:\n'
                             '1. A concise title for the meeting\n'
                             '2. A short meeting summary with key decisions\n'
-                            '3. A numbered list of specific actionable items (things that need to be done)\n\n'
+                            '3. A list of specific actionable items (things that need to be done)\n\n'
                             f'Transcript:\n{transcript_text}'
                         )
                     }
                 ],
                 'temperature': 0.3,
+                'response_format': {'type': 'json_object'},
+                'stream': True,
             },
+            stream=True,
             timeout=60
         )
         if resp.status_code == 200:
-            data = resp.json()
-            content = data['choices'][0]['message']['content']
-
-            # Parse the response to extract title, summary, and action items
-            lines = content.split('\n')
-            title = 'Meeting Summary & Transcript'  # default
-            summary_html = content  # default to full content
-            action_items = []
-
-            # Parse sections
-            current_section = None
-            summary_lines = []
-            action_lines = []
-
-            for line in lines:
-                line_stripped = line.strip()
-                if line_stripped.upper().startswith('TITLE:'):
-                    title = line_stripped[6:].strip()
-                    current_section = 'title'
-                elif line_stripped.upper().startswith('SUMMARY:'):
-                    current_section = 'summary'
-                elif line_stripped.upper().startswith('ACTION ITEMS:'):
-                    current_section = 'actions'
-                elif current_section == 'summary' and line_stripped:
-                    summary_lines.append(line)
-                elif current_section == 'actions' and line_stripped:
-                    # Extract action item text and assignee (remove numbering)
-                    if line_stripped[0].isdigit() or line_stripped.startswith('-'):
-                        # Remove numbering like "1. " or "1) " or "- "
-                        action_text = line_stripped
-                        if '. ' in action_text:
-                            action_text = action_text.split('. ', 1)[-1]
-                        elif ') ' in action_text:
-                            action_text = action_text.split(') ', 1)[-1]
-                        action_text = action_text.lstrip('- ').lstrip('* ').strip()
-                        
-                        # Parse assignee if present
-                        assignee = None
-                        if '| ASSIGNEE:' in action_text or '|ASSIGNEE:' in action_text:
-                            parts = action_text.split('|')
-                            action_text = parts[0].strip()
-                            assignee_part = parts[1].strip()
-                            if assignee_part.upper().startswith('ASSIGNEE:'):
-                                assignee = assignee_part[9:].strip()
-                        
-                        if action_text:
-                            action_items.append({
-                                'task': action_text,
-                                'assignee': assignee
-                            })
-
-            if summary_lines:
-                summary_html = '\n'.join(summary_lines).strip()
+            content = read_openai_stream(resp)
 
-            return {
-                'title': title,
-                'summary_html': summary_html,
-                'action_items': action_items
-            }
+            try:
+                return parse_meeting_summary_json(content)
+            except json.JSONDecodeError:
+                # Not JSON at all; salvage what we can with the text parser
+                return parse_meeting_summary(content)
         else:
             return {
                 'title': 'Meeting Summary & Transcript',
                 'summary_html': f"<p><em>OpenAI summary request failed: {resp.status_code} - {resp.text}</em></p>",
-                'action_items': []
+                'action_items': [],
+                'contributions': {}
             }
     except Exception as e:
         return {
             'title': 'Meeting Summary & Transcript',
             'summary_html': f"<p><em>OpenAI summary error: {e}</em></p>",
-            'action_items': []
+            'action_items': [],
+            'contributions': {}
         }
 
 
@@ -249,115 +327,172 @@ def format_transcript_for_confluence(transcript_text, ai_result):
 
     return page_content
 
-def find_valid_parent_pages(space_key, conf_email, conf_token, base_url):
+def _can_create_child_page(page):
+    """Check the page's expanded operations for permission to create child pages"""
+    return any(
+        op.get('operation') == 'create' and op.get('targetType') == 'page'
+        for op in page.get('operations', [])
+    )
+
+async def _probe_parent_page(client, page_id, space_key):
+    """Try creating a test page under page_id, returning the test page ID on success"""
+    test_data = {
+        "type": "page",
+        "title": f"Test Page - {page_id}",
+        "space": {"key": space_key},
+        "ancestors": [{"id": int(page_id)}],
+        "body": {
+            "storage": {
+                "value": "<p>Test</p>",
+                "representation": "storage"
+            }
+        }
+    }
+
+    create_url = f"{CONFLUENCE_BASE}/wiki/rest/api/content"
+    test_response = await client.post(create_url, headers={'Content-Type': 'application/json'}, json=test_data)
+
+    if test_response.status_code in [200, 201]:
+        return test_response.json()['id']
+
+    print(f"   ❌ Cannot create under: {page_id} - Status: {test_response.status_code}")
+    return None
+
+async def find_valid_parent_pages(client, space_key):
     """Find valid parent pages in the space that we can create pages under"""
     print("🔍 Finding valid parent pages...")
 
-    # Get recent pages from the space
-    search_url = f"{base_url}/wiki/rest/api/content/search"
+    # Get recent pages from the space, along with what we're allowed to do on each
+    search_url = f"{CONFLUENCE_BASE}/wiki/rest/api/content/search"
     params = {
         'cql': f'space={space_key} AND type=page',
         'limit': 10,
-        'expand': 'ancestors'
+        'expand': 'ancestors,operations'
     }
 
-    response = requests.get(search_url, params=params, auth=(conf_email, conf_token))
+    response = await client.get(search_url, params=params)
 
-    if response.status_code == 200:
-        data = response.json()
-        pages = data.get('results', [])
-
-        print(f"📄 Found {len(pages)} pages in space {space_key}:")
-        for page in pages:
-            page_id = page['id']
-            title = page['title']
-            print(f"   ID: {page_id} - Title: {title}")
-
-            # Check if we can create pages under this parent
-            test_data = {
-                "type": "page",
-                "title": f"Test Page - {page_id}",
-                "space": {"key": space_key},
-                "ancestors": [{"id": int(page_id)}],
-                "body": {
-                    "storage": {
-                        "value": "<p>Test</p>",
-                        "representation": "storage"
-                    }
-                }
-            }
+    if response.status_code != 200:
+        return None
+
+    pages = response.json().get('results', [])
+
+    print(f"📄 Found {len(pages)} pages in space {space_key}:")
+    for page in pages:
+        print(f"   ID: {page['id']} - Title: {page['title']}")
+
+    # Permission check is read-only, so prefer it over test-page probes
+    for page in pages:
+        if _can_create_child_page(page):
+            print(f"   ✅ Can create pages under: {page['id']} - {page['title']}")
+            return page['id']
+
+    # Operations missing or inconclusive; fall back to probing candidates one at a time,
+    # stopping at the first success so at most one test page is created
+    for page in pages:
+        try:
+            test_page_id = await _probe_parent_page(client, page['id'], space_key)
+        except httpx.HTTPError as e:
+            print(f"   ❌ Cannot create under: {page['id']} - Error: {e!r}")
+            continue
 
-            create_url = f"{base_url}/wiki/rest/api/content"
-            test_response = requests.post(create_url, headers={'Content-Type': 'application/json'},
-                                        json=test_data, auth=(conf_email, conf_token))
+        if not test_page_id:
+            continue
 
-            if test_response.status_code in [200, 201]:
-                # Delete the test page
-                test_page_data = test_response.json()
-                test_page_id = test_page_data['id']
-                delete_url = f"{base_url}/wiki/rest/api/content/{test_page_id}"
-                requests.delete(delete_url, auth=(conf_email, conf_token))
+        # Delete the test page, and say so if it has to be removed by hand
+        delete_url = f"{CONFLUENCE_BASE}/wiki/rest/api/content/{test_page_id}"
+        try:
+            delete_response = await client.delete(delete_url)
+            if delete_response.status_code not in [200, 204]:
+                print(f"   ⚠️  Could not delete test page {test_page_id} ({delete_response.status_code}); "
+                      f"please remove it manually")
+        except httpx.HTTPError as e:
+            print(f"   ⚠️  Could not delete test page {test_page_id} ({e!r}); please remove it manually")
 
-                print(f"   ✅ Can create pages under: {page_id} - {title}")
-                return page_id
-            else:
-                print(f"   ❌ Cannot create under: {page_id} - Status: {test_response.status_code}")
+        print(f"   ✅ Can create pages under: {page['id']} - {page['title']}")
+        return page['id']
 
     return None
 
-def get_jira_user_by_name(name):
+def load_cached_jira_users():
+    """Return unexpired cached Jira account IDs by name for this Atlassian site"""
+    try:
+        with open(JIRA_USER_CACHE_FILE, "r", encoding="utf-8") as f:
+            entries = json.load(f).get(CONFLUENCE_BASE, {})
+    except (OSError, ValueError):
+        return {}
+
+    now = time.time()
+    return {
+        name: entry['account_id'] for name, entry in entries.items()
+        if entry.get('account_id') and now - entry.get('timestamp', 0) <= JIRA_USER_CACHE_TTL
+    }
+
+def save_cached_jira_users(account_ids):
+    """Remember resolved Jira account IDs by name; unmatched names aren't saved so new users get picked up"""
+    found = {name: account_id for name, account_id in account_ids.items() if account_id}
+    if not found:
+        return
+
+    try:
+        with open(JIRA_USER_CACHE_FILE, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    now = time.time()
+    site = cache.setdefault(CONFLUENCE_BASE, {})
+    for name, account_id in found.items():
+        site[name] = {'account_id': account_id, 'timestamp': now}
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(JIRA_USER_CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+    except OSError as e:
+        print(f"⚠️  Could not cache Jira users: {e}")
+
+async def get_jira_user_by_name(name, client, semaphore):
     """Find Jira user account ID by searching for their name"""
-    base_url = os.getenv('CONFLUENCE_URL', '').rstrip('/')
-    if base_url.endswith('/wiki'):
-        base_url = base_url[:-5]
-    
-    email = os.getenv('CONFLUENCE_EMAIL')
-    token = os.getenv('CONFLUENCE_API_TOKEN')
-    
+    if name in _USER_CACHE:
+        return _USER_CACHE[name]
+
     # Search for user by name
-    search_url = f"{base_url}/rest/api/3/user/search"
+    search_url = f"{CONFLUENCE_BASE}/rest/api/3/user/search"
     params = {'query': name}
-    response = requests.get(search_url, params=params, auth=(email, token))
+    async with semaphore:
+        response = await client.get(search_url, params=params)
     
-    if response.status_code == 200:
-        users = response.json()
-        if users:
-            # Return the first match's account ID
-            return users[0]['accountId']
-    
-    return None
-
-def create_jira_ticket(summary, description, project_key="DUB", issue_type="Task", assignee_name=None, sprint_id=None):
-    """Create a Jira ticket using the same Atlassian credentials as Confluence"""
-    base_url = os.getenv('CONFLUENCE_URL', '').rstrip('/')
-    if base_url.endswith('/wiki'):
-        base_url = base_url[:-5]
-
-    url = f"{base_url}/rest/api/3/issue"
-    email = os.getenv('CONFLUENCE_EMAIL')
-    token = os.getenv('CONFLUENCE_API_TOKEN')
+    if response.status_code != 200:
+        # Don't cache transient failures
+        return None
 
-    data = {
-        "fields": {
-            "project": {"key": project_key},
-            "summary": summary,
-            "description": {
-                "type": "doc",
-                "version": 1,
-                "content": [{
-                    "type": "paragraph",
-                    "content": [{"type": "text", "text": description}]
-                }]
-            },
-            "issuetype": {"name": issue_type}
-        }
+    users = response.json()
+    # Cache the first match's account ID, or None if nobody matched
+    _USER_CACHE[name] = users[0]['accountId'] if users else None
+    return _USER_CACHE[name]
+
+def build_jira_issue_fields(summary, description, project_key="DUB", issue_type="Task",
+                            assignee_name=None, account_id=None, sprint_id=None):
+    """Build the Jira issue 'fields' payload shared by single and bulk creation"""
+    fields = {
+        "project": {"key": project_key},
+        "summary": summary,
+        "description": {
+            "type": "doc",
+            "version": 1,
+            "content": [{
+                "type": "paragraph",
+                "content": [{"type": "text", "text": description}]
+            }]
+        },
+        "issuetype": {"name": issue_type}
     }
 
-    # Find and assign user by name
+    # Assign user resolved by name (see create_jira_tickets)
     if assignee_name:
-        account_id = get_jira_user_by_name(assignee_name)
         if account_id:
-            data["fields"]["assignee"] = {"accountId": account_id}
+            fields["assignee"] = {"accountId": account_id}
             print(f"   👤 Assigning to: {assignee_name}")
         else:
             print(f"   ⚠️  Could not find user: {assignee_name}, leaving unassigned")
@@ -365,118 +500,248 @@ def create_jira_ticket(summary, description, project_key="DUB", issue_type="Task
     # Note: Sprint assignment disabled due to field configuration issues
     # User can manually move tickets to sprint after creation
     # if sprint_id:
-    #     data["fields"]["customfield_10020"] = int(sprint_id)
+    #     fields["customfield_10020"] = int(sprint_id)
 
-    response = requests.post(url, headers={'Content-Type': 'application/json'},
-                           json=data, auth=(email, token))
+    return fields
+
+async def create_jira_ticket(client, semaphore, fields):
+    """Create a Jira ticket using the same Atlassian credentials as Confluence"""
+    url = f"{CONFLUENCE_BASE}/rest/api/3/issue"
+
+    async with semaphore:
+        response = await client.post(url, headers={'Content-Type': 'application/json'}, json={"fields": fields})
 
     if response.status_code in [200, 201]:
         issue_data = response.json()
         issue_key = issue_data['key']
-        print(f"✅ Created Jira ticket: {base_url}/browse/{issue_key}")
+        print(f"✅ Created Jira ticket: {CONFLUENCE_BASE}/browse/{issue_key}")
         return issue_data
     else:
         print(f"❌ Failed to create Jira ticket: {response.status_code}")
         print(f"   {response.text[:200]}")
         return None
 
-def update_engineer_pages(transcript, meeting_title):
-    """Update engineer Confluence pages with their contributions from meeting"""
-    if not ENGINEER_PAGES:
-        return
-    
-    base_url = os.getenv('CONFLUENCE_URL', '').rstrip('/').replace('/wiki', '')
-    email = os.getenv('CONFLUENCE_EMAIL')
-    token = os.getenv('CONFLUENCE_API_TOKEN')
-    api_key = os.getenv('OPENAI_API_KEY')
-    
-    if not api_key:
-        return
-    
-    date = datetime.now().strftime('%B %d, %Y')
-    
-    for name, page_id in ENGINEER_PAGES.items():
-        # Extract contributions with OpenAI
-        resp = requests.post(
-            'https://api.openai.com/v1/chat/completions',
-            headers={'Authorization': f'Bearer {api_key}', 'Content-Type': 'application/json'},
-            json={
-                'model': 'gpt-4o-mini',
-                'messages': [
-                    {'role': 'system', 'content': f'Extract {name}\'s contributions as a bullet list. Return "NONE" if not mentioned.'},
-                    {'role': 'user', 'content': f'What did {name} contribute in this meeting?\n\n{transcript}'}
-                ],
-                'temperature': 0.3
-            },
-            timeout=60
-        )
-        
-        if resp.status_code != 200 or 'NONE' in resp.json()['choices'][0]['message']['content']:
-            continue
-        
-        contributions = resp.json()['choices'][0]['message']['content']
+async def create_jira_tickets_bulk(client, semaphore, issue_fields):
+    """Create up to JIRA_BULK_LIMIT tickets in one request.
+
+    Returns (results, retryable): issue data (or None) per entry, and whether the
+    failed entries are known for certain and safe to retry one at a time.
+    """
+    url = f"{CONFLUENCE_BASE}/rest/api/3/issue/bulk"
+
+    async with semaphore:
+        response = await client.post(url, headers={'Content-Type': 'application/json'},
+                                     json={"issueUpdates": [{"fields": fields} for fields in issue_fields]})
+
+    # 201 is full success, 400 may still contain partial successes alongside per-entry errors.
+    # Any other status (5xx, timeouts, auth, rate limits) may hide created issues, so never retry those.
+    if response.status_code not in [200, 201, 400]:
+        print(f"❌ Bulk Jira ticket creation failed: {response.status_code}")
+        print(f"   {response.text[:200]}")
+        return [None] * len(issue_fields), False
+
+    try:
+        body = response.json()
+        if not isinstance(body, dict):
+            raise ValueError("expected a JSON object")
+    except ValueError:
+        print(f"❌ Bulk Jira ticket creation returned an unreadable response: {response.status_code}")
+        print(f"   {response.text[:200]}")
+        return [None] * len(issue_fields), False
+
+    errors = body.get('errors', [])
+    issues = body.get('issues', [])
+    failed = {error.get('failedElementNumber') for error in errors}
+
+    # Without an index for every error we can't tell which issues were created; don't guess
+    if None in failed or len(failed) != len(errors) or len(issues) + len(failed) != len(issue_fields):
+        print(f"❌ Bulk Jira ticket creation returned an ambiguous result ({len(issues)} created, "
+              f"{len(errors)} errors for {len(issue_fields)} tickets); not retrying individually")
+        print(f"   {response.text[:200]}")
+        return [None] * len(issue_fields), False
+
+    # Created issues come back in request order, skipping the failed entries
+    created = iter(issues)
+    results = []
+    for index in range(len(issue_fields)):
+        issue_data = None if index in failed else next(created)
+        if issue_data:
+            print(f"✅ Created Jira ticket: {CONFLUENCE_BASE}/browse/{issue_data['key']}")
+        results.append(issue_data)
+    return results, True
+
+async def create_jira_tickets(client, action_items, meeting_title, confluence_link, project_key="DUB", sprint_id=None):
+    """Create one Jira ticket per action item via the bulk API, returning the created issue keys"""
+    # Limit in-flight requests to stay under Jira's concurrency limits
+    semaphore = asyncio.Semaphore(5)
+
+    # Resolve each distinct assignee once, in parallel; names resolved on earlier runs skip the search
+    _USER_CACHE.update(load_cached_jira_users())
+    names = list({item['assignee'] for item in action_items if item.get('assignee')})
+    account_ids = await asyncio.gather(*(get_jira_user_by_name(name, client, semaphore) for name in names))
+    assignee_ids = dict(zip(names, account_ids))
+    save_cached_jira_users(assignee_ids)
+
+    issue_fields = []
+    for i, action_item in enumerate(action_items, 1):
+        task = action_item['task']
+        assignee = action_item.get('assignee')
         
-        # Get current page
-        page_resp = requests.get(f"{base_url}/wiki/api/v2/pages/{page_id}?body-format=storage", auth=(email, token))
-        if page_resp.status_code != 200:
-            continue
+        # Create concise summary (max 100 chars for Jira)
+        ticket_summary = task[:97] + '...' if len(task) > 100 else task
         
-        page = page_resp.json()
-        current_body = page.get('body', {}).get('storage', {}).get('value', '')
-        version = page.get('version', {}).get('number', 1)
+        # Create detailed description with context
+        ticket_description = (
+            f"Action item from meeting: {meeting_title}\n\n"
+            f"Task: {task}\n\n"
+            f"Meeting notes: {confluence_link}"
+        )
         
-        # Append new section
-        new_section = f"\n<h3>{meeting_title} - {date}</h3>\n{contributions}\n"
-        updated_body = current_body + new_section
+        print(f"   Creating ticket {i}/{len(action_items)}: {ticket_summary}")
         
-        # Update page
-        requests.put(
-            f"{base_url}/wiki/api/v2/pages/{page_id}",
-            headers={'Accept': 'application/json', 'Content-Type': 'application/json'},
-            json={
-                "id": page_id,
-                "status": "current",
-                "title": page.get('title', ''),
-                "body": {"representation": "storage", "value": updated_body},
-                "version": {"number": version + 1}
-            },
-            auth=(email, token)
-        )
-        print(f"✅ Updated {name}'s page")
+        issue_fields.append(build_jira_issue_fields(
+            summary=ticket_summary,
+            description=ticket_description,
+            project_key=project_key,
+            assignee_name=assignee,
+            account_id=assignee_ids.get(assignee),
+            sprint_id=sprint_id
+        ))
+
+    batches = await asyncio.gather(*(
+        create_jira_tickets_bulk(client, semaphore, issue_fields[start:start + JIRA_BULK_LIMIT])
+        for start in range(0, len(issue_fields), JIRA_BULK_LIMIT)
+    ))
+    results = []
+    failed = []
+    for batch_results, retryable in batches:
+        for issue_data in batch_results:
+            if not issue_data and retryable:
+                failed.append(len(results))
+            results.append(issue_data)
+
+    # Retry entries the bulk endpoint rejected one at a time
+    retried = await asyncio.gather(*(create_jira_ticket(client, semaphore, issue_fields[index]) for index in failed))
+    for index, issue_data in zip(failed, retried):
+        results[index] = issue_data
+
+    created_tickets = []
+    for i, ticket_result in enumerate(results, 1):
+        if ticket_result:
+            created_tickets.append(ticket_result['key'])
+        else:
+            print(f"   ⚠️  Failed to create ticket for action item {i}")
+
+    return created_tickets
+
+async def _process_engineer(name, page_id, client, contributions, meeting_title, date):
+    """Add one engineer's contributions as a child page under their Confluence page"""
+    # A child page per meeting avoids re-reading and re-sending the whole history each run
+    response = await client.post(
+        f"{CONFLUENCE_BASE}/wiki/rest/api/content",
+        headers={'Accept': 'application/json', 'Content-Type': 'application/json'},
+        json={
+            "type": "page",
+            # Titles must be unique within a space
+            "title": f"{name.title()} - {meeting_title} - {date}",
+            "space": {"key": SPACE_KEY},
+            "ancestors": [{"id": int(page_id)}],
+            "body": {
+                "storage": {
+                    "value": contributions,
+                    "representation": "storage"
+                }
+            }
+        }
+    )
 
-def create_confluence_page(title, content):
-    """Create a new Confluence page"""
-    url = f"{os.getenv('CONFLUENCE_URL')}/wiki/rest/api/content"
+    if response.status_code in [200, 201]:
+        print(f"✅ Added meeting notes under {name}'s page")
+    else:
+        print(f"❌ Failed to add meeting notes under {name}'s page: {response.status_code}")
+        print(f"   {response.text[:200]}")
+
+async def update_engineer_pages(client, contributions, meeting_title):
+    """Add each engineer's contributions from the meeting under their Confluence page"""
+    if not ENGINEER_PAGES or not contributions:
+        return
+    
+    date = datetime.now().strftime('%B %d, %Y %I:%M %p')
+    
+    # Engineers are independent, so process them concurrently
+    await asyncio.gather(*(
+        _process_engineer(name, page_id, client, contributions[name], meeting_title, date)
+        for name, page_id in ENGINEER_PAGES.items() if name in contributions
+    ))
+
+def load_cached_parent_page(space_key):
+    """Return the cached parent page ID for a space, or None if missing or expired"""
+    try:
+        with open(PARENT_PAGE_CACHE_FILE, "r", encoding="utf-8") as f:
+            entry = json.load(f).get(space_key)
+    except (OSError, ValueError):
+        return None
+
+    if not entry or time.time() - entry.get('timestamp', 0) > PARENT_PAGE_CACHE_TTL:
+        return None
+    return entry.get('page_id')
+
+def save_cached_parent_page(space_key, page_id):
+    """Remember the parent page discovered for a space"""
+    try:
+        with open(PARENT_PAGE_CACHE_FILE, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    cache[space_key] = {'page_id': page_id, 'timestamp': time.time()}
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(PARENT_PAGE_CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+    except OSError as e:
+        print(f"⚠️  Could not cache parent page: {e}")
+
+def forget_cached_parent_page(space_key):
+    """Drop a space's cached parent page after it stops accepting new pages"""
+    try:
+        with open(PARENT_PAGE_CACHE_FILE, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return
+
+    if cache.pop(space_key, None) is None:
+        return
+
+    try:
+        with open(PARENT_PAGE_CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+    except OSError as e:
+        print(f"⚠️  Could not update parent page cache: {e}")
 
+async def create_confluence_page(client, title, content):
+    """Create a new Confluence page"""
     headers = {
         'Content-Type': 'application/json'
     }
 
-    # Use Basic auth with email + API token for Confluence Cloud
-    conf_email = os.getenv('CONFLUENCE_EMAIL')
-    conf_token = os.getenv('CONFLUENCE_API_TOKEN')
-    space_key = os.getenv('CONFLUENCE_SPACE_KEY')
     parent_page_id = os.getenv('CONFLUENCE_PARENT_PAGE_ID', '491523')
 
-    # Fix double /wiki/ issue
-    base_url = os.getenv('CONFLUENCE_URL', '').rstrip('/')
-    if base_url.endswith('/wiki'):
-        base_url = base_url[:-5]  # Remove /wiki if it exists
-
-    url = f"{base_url}/wiki/rest/api/content"
+    url = f"{CONFLUENCE_BASE}/wiki/rest/api/content"
 
     print(f"🔍 Debug info:")
-    print(f"   Base URL: {base_url}")
+    print(f"   Base URL: {CONFLUENCE_BASE}")
     print(f"   Full URL: {url}")
-    print(f"   Space: {space_key}")
+    print(f"   Space: {SPACE_KEY}")
     print(f"   Parent Page ID: {parent_page_id}")
-    print(f"   Email: {conf_email}")
+    print(f"   Email: {CONFLUENCE_AUTH[0]}")
 
     # Try to create page at space root first (no parent needed)
     data = {
         "type": "page",
         "title": title,
-        "space": {"key": space_key},
+        "space": {"key": SPACE_KEY},
         "body": {
             "storage": {
                 "value": content,
@@ -485,15 +750,30 @@ def create_confluence_page(title, content):
         }
     }
 
-    print(f"📝 Creating page at space root...")
-    response = requests.post(url, headers=headers, json=data, auth=(conf_email, conf_token))
+    response = None
+
+    # Reuse the parent page discovered on a previous run, if any
+    cached_parent = load_cached_parent_page(SPACE_KEY)
+    if cached_parent:
+        print(f"📝 Creating page under cached parent page {cached_parent}...")
+        response = await client.post(url, headers=headers, json={**data, "ancestors": [{"id": int(cached_parent)}]})
+        if response.status_code not in [200, 201]:
+            print(f"⚠️  Cached parent page failed ({response.status_code}), falling back...")
+            # The parent is gone or no longer accepts pages; don't try it again next run
+            if response.status_code in [400, 403, 404]:
+                forget_cached_parent_page(SPACE_KEY)
+            response = None
+
+    if response is None:
+        print(f"📝 Creating page at space root...")
+        response = await client.post(url, headers=headers, json=data)
 
     # If space root creation fails, try with parent page
     if response.status_code not in [200, 201]:
         print(f"⚠️  Space root creation failed ({response.status_code}), trying with parent page...")
         
         # Try to find a valid parent page automatically
-        valid_parent = find_valid_parent_pages(space_key, conf_email, conf_token, base_url)
+        valid_parent = await find_valid_parent_pages(client, SPACE_KEY)
 
         if valid_parent:
             parent_page_id = valid_parent
@@ -502,7 +782,11 @@ def create_confluence_page(title, content):
             # Add ancestors and retry
             data["ancestors"] = [{"id": int(parent_page_id)}]
             print(f"📝 Retrying with parent page...")
-            response = requests.post(url, headers=headers, json=data, auth=(conf_email, conf_token))
+            response = await client.post(url, headers=headers, json=data)
+
+            # Only remember a parent that actually accepted the page
+            if response.status_code in [200, 201]:
+                save_cached_parent_page(SPACE_KEY, parent_page_id)
         else:
             print("❌ No valid parent pages found. Please check your space permissions.")
             return None
@@ -512,9 +796,9 @@ def create_confluence_page(title, content):
         page_url = page_data['_links']['webui']
         # Fix double /wiki/ if present
         if page_url.startswith('/wiki/'):
-            full_url = f"{base_url}{page_url}"
+            full_url = f"{CONFLUENCE_BASE}{page_url}"
         else:
-            full_url = f"{base_url}/wiki{page_url}"
+            full_url = f"{CONFLUENCE_BASE}/wiki{page_url}"
         print(f"✅ Created Confluence page: {full_url}")
         return page_data
     else:
@@ -522,13 +806,21 @@ def create_confluence_page(title, content):
         print(response.text)
         return None
 
-def main():
+def create_atlassian_client():
+    """Create the HTTP/2 client shared by all Jira and Confluence calls in a run"""
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=httpx.Timeout(60.0),
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
+        auth=CONFLUENCE_AUTH
+    )
+
+async def main():
     # Load the manually fetched transcript
     transcript_file = "../Zoom_Audio.transcript.txt"
 
     print(f"📄 Reading transcript from {transcript_file}...")
-    with open(transcript_file, "r", encoding="utf-8") as f:
-        transcript = f.read().strip()
+    transcript = Path(transcript_file).read_text(encoding="utf-8").strip()
 
     if not transcript:
         print("❌ Transcript file is empty")
@@ -536,6 +828,11 @@ def main():
 
     print(f"✅ Loaded transcript ({len(transcript)} characters)")
 
+    # httpx rejects a None username/password; check before paying for the OpenAI call
+    if not all(CONFLUENCE_AUTH):
+        print("❌ CONFLUENCE_EMAIL and CONFLUENCE_API_TOKEN must be set to upload to Confluence and Jira")
+        return
+
     print(f"🤖 Generating title and summary with OpenAI...")
 
     # Generate title and summary via OpenAI
@@ -557,72 +854,52 @@ def main():
 
     # Create Confluence page using AI-generated title with timestamp
     print(f"📤 Uploading to Confluence...")
-    confluence_result = create_confluence_page(unique_title, confluence_content)
-
-    if confluence_result:
-        print("✅ Successfully uploaded to Confluence!")
-        # Get full URL for the Confluence page
-        base_url = os.getenv('CONFLUENCE_URL', '').rstrip('/')
-        if base_url.endswith('/wiki'):
-            base_url = base_url[:-5]
-        confluence_link = f"{base_url}/wiki{confluence_result.get('_links', {}).get('webui', '')}"
-    else:
-        print("❌ Failed to upload to Confluence")
-        confluence_link = 'N/A'
+    async with create_atlassian_client() as client:
+        confluence_result = await create_confluence_page(client, unique_title, confluence_content)
 
-    # Create Jira tickets for action items using LLM-extracted tasks
-    if ai_result['action_items']:
-        print(f"\n🎫 Creating Jira tickets for {len(ai_result['action_items'])} action items...")
+        if confluence_result:
+            print("✅ Successfully uploaded to Confluence!")
+            # Get full URL for the Confluence page
+            confluence_link = f"{CONFLUENCE_BASE}/wiki{confluence_result.get('_links', {}).get('webui', '')}"
+        else:
+            print("❌ Failed to upload to Confluence")
+            confluence_link = 'N/A'
 
-        project_key = os.getenv('JIRA_PROJECT_KEY', 'DUB')
+        # Create Jira tickets for action items using LLM-extracted tasks
+        if ai_result['action_items']:
+            print(f"\n🎫 Creating Jira tickets for {len(ai_result['action_items'])} action items...")
+
+            project_key = os.getenv('JIRA_PROJECT_KEY', 'DUB')
         
-        # Sprint assignment temporarily disabled - manual assignment recommended
-        # sprint_id = os.getenv('JIRA_SPRINT_ID')
-        # if not sprint_id:
-        #     sprint_id = get_active_sprint(project_key)
-        sprint_id = None
-
-        created_tickets = []
-        for i, action_item in enumerate(ai_result['action_items'], 1):
-            task = action_item['task']
-            assignee = action_item.get('assignee')
-            
-            # Create concise summary (max 100 chars for Jira)
-            ticket_summary = task[:97] + '...' if len(task) > 100 else task
-            
-            # Create detailed description with context
-            ticket_description = (
-                f"Action item from meeting: {ai_result['title']}\n\n"
-                f"Task: {task}\n\n"
-                f"Meeting notes: {confluence_link}"
-            )
-            
-            print(f"   Creating ticket {i}/{len(ai_result['action_items'])}: {ticket_summary}")
-            
-            ticket_result = create_jira_ticket(
-                summary=ticket_summary,
-                description=ticket_description,
+            # Sprint assignment temporarily disabled - manual assignment recommended
+            # sprint_id = os.getenv('JIRA_SPRINT_ID')
+            # if not sprint_id:
+            #     sprint_id = get_active_sprint(project_key)
+            sprint_id = None
+
+            created_tickets = await create_jira_tickets(
+                client,
+                ai_result['action_items'],
+                ai_result['title'],
+                confluence_link,
                 project_key=project_key,
-                assignee_name=assignee,
                 sprint_id=sprint_id
             )
-            
-            if ticket_result:
-                created_tickets.append(ticket_result['key'])
-            else:
-                print(f"   ⚠️  Failed to create ticket for action item {i}")
         
-        if created_tickets:
-            print(f"\n✅ Created {len(created_tickets)} Jira tickets: {', '.join(created_tickets)}")
-    else:
-        print("\nℹ️  No action items found - no Jira tickets created")
+            if created_tickets:
+                print(f"\n✅ Created {len(created_tickets)} Jira tickets: {', '.join(created_tickets)}")
+        else:
+            print("\nℹ️  No action items found - no Jira tickets created")
 
-    # Update engineer pages
-    if ENGINEER_PAGES:
-        print(f"\n📝 Updating {len(ENGINEER_PAGES)} engineer page(s)...")
-        update_engineer_pages(transcript, ai_result['title'])
+        # Add meeting notes under engineer pages (child pages need a space key)
+        if ENGINEER_PAGES and ai_result['contributions']:
+            if not SPACE_KEY:
+                print("\n⚠️  CONFLUENCE_SPACE_KEY not set - skipping engineer pages")
+            else:
+                print(f"\n📝 Adding meeting notes for {len(ai_result['contributions'])} engineer(s)...")
+                await update_engineer_pages(client, ai_result['contributions'], ai_result['title'])
 
     print("\n✅ Done!")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())